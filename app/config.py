@@ -1,7 +1,24 @@
 import os
+import types
+import zipfile
+import zlib
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Use ISA-L's accelerated DEFLATE for ZIP extraction (uploaded archives and
+# the ZIP containers inside DOCX files) when python-isal is installed. Only
+# zipfile sees the patched module; other zlib users such as pdfminer and
+# httpx keep stdlib zlib and its zlib.error exceptions.
+try:
+    from isal import isal_zlib
+    _zipfile_zlib = types.ModuleType("zlib")
+    _zipfile_zlib.__dict__.update(zlib.__dict__)
+    _zipfile_zlib.decompress = isal_zlib.decompress
+    _zipfile_zlib.decompressobj = isal_zlib.decompressobj
+    zipfile.zlib = _zipfile_zlib
+except ImportError:
+    pass
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -12,6 +29,18 @@ class Config:
     MAX_ZIP_SIZE_MB: int = int(os.getenv("MAX_ZIP_SIZE_MB", "50"))
     MAX_ZIP_SIZE_BYTES: int = MAX_ZIP_SIZE_MB * 1024 * 1024
     
+    # Limits applied to ZIP contents before anything is decompressed
+    MAX_UNCOMPRESSED_MB: int = int(os.getenv("MAX_UNCOMPRESSED_MB", "500"))
+    MAX_UNCOMPRESSED_BYTES: int = MAX_UNCOMPRESSED_MB * 1024 * 1024
+    MAX_COMPRESSION_RATIO: int = int(os.getenv("MAX_COMPRESSION_RATIO", "100"))
+    MAX_RESUMES_PER_ZIP: int = int(os.getenv("MAX_RESUMES_PER_ZIP", "500"))
+    
+    # Number of worker processes used to parse resumes in parallel
+    MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", str(os.cpu_count() or 1)))
+    
+    # Number of resumes handed to a worker at once (shared spaCy pipe call)
+    PARSE_BATCH_SIZE: int = int(os.getenv("PARSE_BATCH_SIZE", "8"))
+    
     # OpenAI settings (optional)
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     
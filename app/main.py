@@ -1,18 +1,24 @@
+import asyncio
+import csv
 import logging
-from pathlib import Path
-from typing import List
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import List, Tuple
 import io
 
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import StreamingResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-import pandas as pd
 
 from .config import config
 from .schemas import ResumeRecord, ExtractedData
 from .services.file_service import FileService
-from .services.resume_parser import ResumeParser
+from .services.worker import _init_worker, _parse_batch, _ready
 
 # Configure logging
 logging.basicConfig(
@@ -21,13 +27,113 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# CSV report column headers
+CSV_HEADERS = [
+    'S. No',
+    'Name',
+    'Address',
+    'Email',
+    'Contact Number',
+    'Last Qualification',
+    'Last Institution Attended'
+]
+
+# Start workers from a clean forkserver (spawn on Windows) rather than fork:
+# replacement pools are created mid-request while the app has threads running,
+# and forking a process with live threads can deadlock the child
+_MP_CONTEXT = multiprocessing.get_context("spawn" if sys.platform == "win32" else "forkserver")
+
+def _create_executor(max_workers: int = config.MAX_WORKERS) -> ProcessPoolExecutor:
+    """Create a process pool used to parse resumes"""
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=_MP_CONTEXT, initializer=_init_worker)
+
+async def _replace_broken_executor(broken: ProcessPoolExecutor) -> None:
+    """Swap in a fresh process pool if the given one is still the active, broken pool"""
+    async with app.state.executor_lock:
+        if app.state.executor is broken:
+            logger.warning("Resume parsing pool is broken, starting a new one")
+            app.state.executor = _create_executor()
+            broken.shutdown(wait=False, cancel_futures=True)
+
+async def _run_parse_batch(batch: List[Tuple[str, bytes]]) -> List[ExtractedData]:
+    """
+    Parse a batch on the shared process pool. If a worker process died (OOM
+    kill, crash in a native PDF library), the pool is replaced and the batch
+    is retried resume by resume on its own pool, since every batch in flight
+    on the broken pool fails with it whether or not it caused the crash
+    """
+    loop = asyncio.get_running_loop()
+    executor = app.state.executor
+    try:
+        return await loop.run_in_executor(executor, _parse_batch, batch)
+    except BrokenProcessPool:
+        await _replace_broken_executor(executor)
+    
+    logger.warning(f"Retrying batch of {len(batch)} resumes one by one after the parsing pool broke")
+    return await _parse_batch_isolated(batch)
+
+async def _parse_batch_isolated(batch: List[Tuple[str, bytes]]) -> List[ExtractedData]:
+    """
+    Parse a batch one resume per task on a private single-worker pool, so a
+    resume that kills its worker only blanks its own row and cannot break the
+    shared pool or other batches' retries
+    """
+    loop = asyncio.get_running_loop()
+    results: List[ExtractedData] = []
+    executor = None
+    
+    try:
+        for filename, file_content in batch:
+            if executor is None:
+                executor = _create_executor(max_workers=1)
+            try:
+                results.extend(await loop.run_in_executor(executor, _parse_batch, [(filename, file_content)]))
+            except BrokenProcessPool:
+                logger.error(f"Worker process died while parsing {filename}, leaving its row blank")
+                results.append(ExtractedData())
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = None
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return results
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create and warm up the resume parsing process pool on startup and shut it down on exit"""
+    app.state.executor = _create_executor()
+    app.state.executor_lock = asyncio.Lock()
+    
+    # Start every worker now so model loading and warm-up happen before the first request
+    loop = asyncio.get_running_loop()
+    try:
+        await asyncio.gather(*(
+            loop.run_in_executor(app.state.executor, _ready)
+            for _ in range(config.MAX_WORKERS)
+        ))
+    except BrokenProcessPool:
+        app.state.executor.shutdown(wait=False, cancel_futures=True)
+        logger.error("Resume parsing workers failed to start; check the worker logs above")
+        raise
+    logger.info(f"Started resume parsing pool with {config.MAX_WORKERS} workers")
+    try:
+        yield
+    finally:
+        app.state.executor.shutdown(wait=True)
+        logger.info("Resume parsing pool shut down")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Resume Analyzer",
     description="A web application for analyzing resumes and generating CSV reports",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Compress responses, including the streamed CSV, chunk by chunk
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -36,7 +142,6 @@ templates = Jinja2Templates(directory="app/templates")
 
 # Initialize services
 file_service = FileService()
-resume_parser = ResumeParser()
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
@@ -64,66 +169,77 @@ async def download_csv(file: UploadFile = File(...)):
         
         logger.info(f"Processing ZIP file: {file.filename} ({len(zip_content)} bytes)")
         
-        # Extract resume files from ZIP
-        resume_files = file_service.extract_resume_files(zip_content)
+        # Extract resume files from ZIP without blocking the event loop
+        unique_files, resume_entries = await asyncio.to_thread(file_service.extract_resume_files, zip_content)
+        
+        logger.info(f"Found {len(resume_entries)} resume files to process ({len(unique_files)} unique)")
         
-        logger.info(f"Found {len(resume_files)} resume files to process")
+        # Parse unique resumes in parallel batches on the process pool; the
+        # semaphore bounds how many batches this request keeps in flight at once
+        batch_size = config.PARSE_BATCH_SIZE
+        batches = [
+            unique_files[i:i + batch_size]
+            for i in range(0, len(unique_files), batch_size)
+        ]
+        sem = asyncio.Semaphore(config.MAX_WORKERS)
         
-        # Process each resume file
-        resume_records: List[ResumeRecord] = []
+        async def parse_batch(batch):
+            async with sem:
+                return await _run_parse_batch(batch)
         
-        for idx, (filename, file_content) in enumerate(resume_files, 1):
-            logger.info(f"Processing resume {idx}/{len(resume_files)}: {filename}")
+        tasks = [asyncio.create_task(parse_batch(batch)) for batch in batches]
+        
+        # Stream CSV rows to the client in order as each batch finishes parsing
+        async def generate_csv():
+            buf = io.StringIO()
+            writer = csv.writer(buf, lineterminator='\n')
+            
+            def flush() -> str:
+                data = buf.getvalue()
+                buf.seek(0)
+                buf.truncate(0)
+                return data
+            
+            writer.writerow(CSV_HEADERS)
+            yield flush()
             
             try:
-                # Parse the resume
-                extracted_data = resume_parser.parse_resume(filename, file_content)
-                
-                # Create resume record
-                record = ResumeRecord(
-                    s_no=idx,
-                    name=extracted_data.name,
-                    address=extracted_data.address,
-                    email=extracted_data.email,
-                    contact_number=extracted_data.contact_number,
-                    last_qualification=extracted_data.last_qualification,
-                    last_institution=extracted_data.last_institution
-                )
+                # Duplicates reuse the parse result of their unique file; unique
+                # indices are assigned in ZIP order, so rows never wait on a
+                # later batch than necessary
+                for idx, (filename, unique_idx) in enumerate(resume_entries, 1):
+                    batch_results = await tasks[unique_idx // batch_size]
+                    extracted_data = batch_results[unique_idx % batch_size]
+                    
+                    record = ResumeRecord(
+                        idx,
+                        extracted_data.name or '',
+                        extracted_data.address or '',
+                        extracted_data.email or '',
+                        extracted_data.contact_number or '',
+                        extracted_data.last_qualification or '',
+                        extracted_data.last_institution or ''
+                    )
+                    
+                    writer.writerow((
+                        record.s_no,
+                        record.name,
+                        record.address,
+                        record.email,
+                        record.contact_number,
+                        record.last_qualification,
+                        record.last_institution
+                    ))
+                    logger.info(f"Processed resume {idx}/{len(resume_entries)}: {filename}")
+                    
+                    yield flush()
                 
-                resume_records.append(record)
-                logger.info(f"Successfully processed {filename}")
-                
-            except Exception as e:
-                logger.error(f"Error processing {filename}: {str(e)}")
-                # Add empty record for failed processing
-                record = ResumeRecord(s_no=idx)
-                resume_records.append(record)
-        
-        # Convert to DataFrame
-        df_data = []
-        for record in resume_records:
-            df_data.append({
-                'S. No': record.s_no,
-                'Name': record.name or '',
-                'Address': record.address or '',
-                'Email': record.email or '',
-                'Contact Number': record.contact_number or '',
-                'Last Qualification': record.last_qualification or '',
-                'Last Institution Attended': record.last_institution or ''
-            })
-        
-        df = pd.DataFrame(df_data)
-        
-        # Generate CSV content
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        csv_content = csv_buffer.getvalue()
-        
-        logger.info(f"Generated CSV with {len(resume_records)} records")
-        
-        # Create streaming response
-        def generate_csv():
-            yield csv_content
+                logger.info(f"Generated CSV with {len(resume_entries)} records")
+            
+            finally:
+                # Stop queued work if the client disconnects mid-stream
+                for task in tasks:
+                    task.cancel()
         
         return StreamingResponse(
             generate_csv(),
@@ -154,4 +270,12 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        reload=True,
+        # uvloop is not available on Windows
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
+    )
\ No newline at end of file
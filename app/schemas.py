@@ -1,19 +1,17 @@
+from dataclasses import dataclass
 from typing import Optional
 from pydantic import BaseModel
 
-class ResumeRecord(BaseModel):
-    """Schema for a single resume record"""
+@dataclass(slots=True)
+class ResumeRecord:
+    """A single CSV row; internal only, so it skips pydantic validation"""
     s_no: int
-    name: Optional[str] = None
-    address: Optional[str] = None
-    email: Optional[str] = None
-    contact_number: Optional[str] = None
-    last_qualification: Optional[str] = None
-    last_institution: Optional[str] = None
-    
-    class Config:
-        # Allow field names with underscores
-        populate_by_name = True
+    name: str = ''
+    address: str = ''
+    email: str = ''
+    contact_number: str = ''
+    last_qualification: str = ''
+    last_institution: str = ''
 
 class ExtractedData(BaseModel):
     """Schema for extracted resume data before CSV conversion"""
@@ -1,8 +1,9 @@
+import hashlib
+import io
 import zipfile
-import tempfile
 import shutil
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import logging
 from fastapi import HTTPException, UploadFile
 
@@ -37,54 +38,73 @@ class FileService:
                 )
     
     @staticmethod
-    def extract_resume_files(zip_content: bytes) -> List[Tuple[str, bytes]]:
+    def extract_resume_files(zip_content: bytes) -> Tuple[List[Tuple[str, bytes]], List[Tuple[str, int]]]:
         """
-        Extract resume files from ZIP content
-        Returns list of tuples: (filename, file_content)
+        Extract resume files from ZIP content, keeping one copy of files
+        with identical content
+        Returns a tuple of:
+            - list of unique (filename, file_content) tuples to parse
+            - list of (filename, unique_index) for every resume in ZIP order,
+              where unique_index points into the unique files list
         """
-        resume_files = []
+        unique_files: List[Tuple[str, bytes]] = []
+        resume_entries: List[Tuple[str, int]] = []
+        index_by_hash: Dict[Tuple[str, bytes], int] = {}
         
         try:
-            # Create temporary file for ZIP content
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
-                temp_zip.write(zip_content)
-                temp_zip_path = temp_zip.name
-            
-            try:
-                with zipfile.ZipFile(temp_zip_path, 'r') as zip_ref:
-                    # Get list of files in ZIP
-                    file_list = zip_ref.namelist()
+            with zipfile.ZipFile(io.BytesIO(zip_content), 'r') as zip_ref:
+                # Collect the resume entries to read from the ZIP
+                resume_infos: List[zipfile.ZipInfo] = []
+                
+                for info in zip_ref.infolist():
+                    file_path = info.filename
                     
-                    for file_path in file_list:
-                        # Skip directories
-                        if file_path.endswith('/'):
-                            continue
-                        
-                        # Check for directory traversal attacks
-                        if '..' in file_path or file_path.startswith('/'):
-                            logger.warning(f"Skipping potentially unsafe file path: {file_path}")
-                            continue
-                        
-                        # Get file extension
-                        file_ext = Path(file_path).suffix.lower()
-                        
-                        # Only process PDF and DOCX files
-                        if file_ext in config.ALLOWED_RESUME_EXTENSIONS:
-                            try:
-                                file_content = zip_ref.read(file_path)
-                                filename = Path(file_path).name
-                                resume_files.append((filename, file_content))
-                                logger.info(f"Extracted resume file: {filename}")
-                            except Exception as e:
-                                logger.error(f"Error reading file {file_path} from ZIP: {str(e)}")
-                                continue
-                        else:
-                            logger.info(f"Skipping non-resume file: {file_path}")
-            
-            finally:
-                # Clean up temporary ZIP file
-                Path(temp_zip_path).unlink(missing_ok=True)
+                    # Skip directories
+                    if info.is_dir():
+                        continue
+                    
+                    # Check for directory traversal attacks
+                    if '..' in file_path or file_path.startswith('/'):
+                        logger.warning(f"Skipping potentially unsafe file path: {file_path}")
+                        continue
+                    
+                    # Only process PDF and DOCX files
+                    if Path(file_path).suffix.lower() in config.ALLOWED_RESUME_EXTENSIONS:
+                        resume_infos.append(info)
+                    else:
+                        logger.info(f"Skipping non-resume file: {file_path}")
+                
+                # Reject oversized archives and ZIP bombs before decompressing anything
+                FileService._check_zip_limits(resume_infos)
+                
+                for info in resume_infos:
+                    file_path = info.filename
+                    file_ext = Path(file_path).suffix.lower()
+                    
+                    try:
+                        file_content = zip_ref.read(info)
+                        filename = Path(file_path).name
+                    except Exception as e:
+                        logger.error(f"Error reading file {file_path} from ZIP: {str(e)}")
+                        continue
+                    
+                    # Files are parsed by extension, so it is part of the key
+                    content_hash = (file_ext, hashlib.blake2b(file_content, digest_size=16).digest())
+                    unique_idx = index_by_hash.get(content_hash)
+                    
+                    if unique_idx is None:
+                        unique_idx = len(unique_files)
+                        index_by_hash[content_hash] = unique_idx
+                        unique_files.append((filename, file_content))
+                        logger.info(f"Extracted resume file: {filename}")
+                    else:
+                        logger.info(f"Extracted resume file: {filename} (duplicate of {unique_files[unique_idx][0]})")
+                    
+                    resume_entries.append((filename, unique_idx))
         
+        except HTTPException:
+            # Re-raise HTTP exceptions
+            raise
         except zipfile.BadZipFile:
             raise HTTPException(
                 status_code=400,
@@ -97,10 +117,34 @@ class FileService:
                 detail="Error processing ZIP file"
             )
         
-        if not resume_files:
+        if not resume_entries:
             raise HTTPException(
                 status_code=400,
                 detail="No valid resume files (PDF or DOCX) found in ZIP"
             )
         
-        return resume_files
\ No newline at end of file
+        return unique_files, resume_entries
+    
+    @staticmethod
+    def _check_zip_limits(infos: List[zipfile.ZipInfo]) -> None:
+        """Validate resume entry count, total uncompressed size and compression ratios"""
+        if len(infos) > config.MAX_RESUMES_PER_ZIP:
+            raise HTTPException(
+                status_code=400,
+                detail=f"ZIP contains more than the maximum of {config.MAX_RESUMES_PER_ZIP} resume files"
+            )
+        
+        total_size = sum(info.file_size for info in infos)
+        if total_size > config.MAX_UNCOMPRESSED_BYTES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Uncompressed size exceeds maximum allowed size of {config.MAX_UNCOMPRESSED_MB}MB"
+            )
+        
+        for info in infos:
+            if info.file_size / max(info.compress_size, 1) > config.MAX_COMPRESSION_RATIO:
+                logger.warning(f"Rejecting ZIP with suspicious compression ratio for {info.filename}")
+                raise HTTPException(
+                    status_code=400,
+                    detail="ZIP file contains a suspiciously highly compressed entry"
+                )
\ No newline at end of file
@@ -1,18 +1,34 @@
+import hashlib
 import json
 import logging
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from openai import OpenAI
+from pydantic import ValidationError
 
 from ..config import config
 from ..schemas import ExtractedData
+from .text_extractors import condense_resume_text
 
 logger = logging.getLogger(__name__)
 
 class LLMExtractor:
     """Service for extracting resume data using OpenAI LLM"""
     
+    # Maximum number of extraction results kept in the in-memory cache
+    CACHE_MAX_SIZE = 1024
+    
+    # Completion token budget per resume in a request
+    MAX_TOKENS_PER_RESUME = 500
+    
+    # Maximum number of OpenAI requests in flight at once
+    MAX_CONCURRENT_REQUESTS = 4
+    
     def __init__(self):
         self.client = None
+        # Successful extractions keyed by resume text hash, in LRU order
+        self._cache: "OrderedDict[str, ExtractedData]" = OrderedDict()
         if config.is_llm_enabled():
             try:
                 self.client = OpenAI(api_key=config.OPENAI_API_KEY)
@@ -21,17 +37,82 @@ class LLMExtractor:
                 logger.error(f"Failed to initialize OpenAI client: {str(e)}")
                 self.client = None
     
+    def preflight(self) -> None:
+        """Make a cheap API call so the connection is established before the first resume"""
+        if not self.client:
+            return
+        
+        try:
+            # Short timeout and no retries so a stalled endpoint cannot hold up startup
+            self.client.with_options(timeout=5, max_retries=0).models.list()
+            logger.info("OpenAI connection preflight successful")
+        except Exception as e:
+            logger.warning(f"OpenAI connection preflight failed: {str(e)}")
+    
     def extract_data(self, text: str) -> Optional[ExtractedData]:
         """
         Extract resume data using LLM
         Returns None if LLM is disabled or extraction fails
         """
+        return self.extract_data_batch([text])[0]
+    
+    def extract_data_batch(self, texts: List[str], batch_size: int = 5) -> List[Optional[ExtractedData]]:
+        """
+        Extract resume data for several resumes, sending up to batch_size
+        resumes per OpenAI request
+        
+        Returns a list aligned with texts; an entry is None if LLM is disabled
+        or extraction failed for that resume
+        """
+        results: List[Optional[ExtractedData]] = [None] * len(texts)
+        
         if not self.client:
             logger.info("LLM extraction disabled - no OpenAI API key configured")
-            return None
+            return results
+        
+        # Duplicate resumes and re-uploads skip the API round-trip; identical
+        # texts within this call are only sent once
+        pending: "OrderedDict[str, List[int]]" = OrderedDict()
+        for idx, text in enumerate(texts):
+            cache_key = self._cache_key(text)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                logger.info("LLM extraction served from cache")
+                results[idx] = cached
+            else:
+                pending.setdefault(cache_key, []).append(idx)
+        
+        pending_keys = list(pending)
+        chunks = [
+            pending_keys[start:start + batch_size]
+            for start in range(0, len(pending_keys), batch_size)
+        ]
+        if not chunks:
+            return results
+        
+        # Issue the batch requests concurrently so their network waits overlap
+        with ThreadPoolExecutor(max_workers=min(len(chunks), self.MAX_CONCURRENT_REQUESTS)) as pool:
+            responses = list(pool.map(
+                self._request_batch,
+                [[texts[pending[key][0]] for key in chunk] for chunk in chunks]
+            ))
+        
+        for chunk, extracted in zip(chunks, responses):
+            for cache_key, extracted_data in zip(chunk, extracted):
+                if extracted_data is not None:
+                    self._store_in_cache(cache_key, extracted_data)
+                for idx in pending[cache_key]:
+                    results[idx] = extracted_data
+        
+        return results
+    
+    def _request_batch(self, texts: List[str]) -> List[Optional[ExtractedData]]:
+        """Send one OpenAI request for a batch of resumes and map results back to inputs"""
+        failed: List[Optional[ExtractedData]] = [None] * len(texts)
         
         try:
-            prompt = self._create_extraction_prompt(text)
+            prompt = self._create_extraction_prompt(texts)
             
             response = self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
@@ -45,8 +126,9 @@ class LLMExtractor:
                         "content": prompt
                     }
                 ],
+                response_format={"type": "json_object"},
                 temperature=0.1,
-                max_tokens=500
+                max_tokens=self.MAX_TOKENS_PER_RESUME * len(texts)
             )
             
             # Extract the response content
@@ -54,34 +136,63 @@ class LLMExtractor:
             
             # Parse JSON response
             try:
-                data = json.loads(content)
-                
-                # Validate required fields exist
-                extracted_data = ExtractedData(
-                    name=data.get('name'),
-                    address=data.get('address'),
-                    email=data.get('email'),
-                    contact_number=data.get('contact_number'),
-                    last_qualification=data.get('last_qualification'),
-                    last_institution=data.get('last_institution')
-                )
-                
-                logger.info("LLM extraction successful")
-                return extracted_data
-                
-            except json.JSONDecodeError as e:
+                resumes = json.loads(content).get('resumes')
+            except (json.JSONDecodeError, AttributeError) as e:
                 logger.error(f"Failed to parse LLM JSON response: {str(e)}")
                 logger.error(f"Raw response: {content}")
-                return None
+                return failed
+            
+            if not isinstance(resumes, list) or len(resumes) != len(texts):
+                logger.error(f"LLM returned {len(resumes) if isinstance(resumes, list) else 'no'} results for {len(texts)} resumes")
+                return failed
+            
+            results: List[Optional[ExtractedData]] = []
+            for data in resumes:
+                if not isinstance(data, dict):
+                    results.append(None)
+                    continue
+                
+                # Validate each resume on its own so one malformed item (e.g. a
+                # phone number returned as a JSON number) only drops that resume
+                try:
+                    results.append(ExtractedData(
+                        name=data.get('name'),
+                        address=data.get('address'),
+                        email=data.get('email'),
+                        contact_number=data.get('contact_number'),
+                        last_qualification=data.get('last_qualification'),
+                        last_institution=data.get('last_institution')
+                    ))
+                except ValidationError as e:
+                    logger.error(f"Invalid LLM result for resume {len(results) + 1} of {len(texts)}: {str(e)}")
+                    results.append(None)
+            
+            logger.info(f"LLM extraction successful for {len(texts)} resumes")
+            return results
         
         except Exception as e:
             logger.error(f"LLM extraction failed: {str(e)}")
-            return None
+            return failed
+    
+    @staticmethod
+    def _cache_key(text: str) -> str:
+        """Hash resume text into a compact cache key"""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _store_in_cache(self, cache_key: str, extracted_data: ExtractedData) -> None:
+        """Store an extraction result, evicting the least recently used entry when full"""
+        self._cache[cache_key] = extracted_data
+        self._cache.move_to_end(cache_key)
+        if len(self._cache) > self.CACHE_MAX_SIZE:
+            self._cache.popitem(last=False)
     
-    def _create_extraction_prompt(self, text: str) -> str:
-        """Create extraction prompt for the LLM"""
+    def _create_extraction_prompt(self, texts: List[str]) -> str:
+        """Create extraction prompt for a batch of resumes"""
+        resumes = "\n\n".join(
+            f"### Resume {i}\n{condense_resume_text(text)}" for i, text in enumerate(texts, 1)
+        )
         return f"""
-Extract the following information from this resume text and return ONLY a JSON object with these exact keys:
+Extract the following information from each of the {len(texts)} resumes below and return ONLY a JSON object of the form {{"resumes": [...]}}, where "resumes" is an array of exactly {len(texts)} objects in the same order as the resumes, each with these exact keys:
 
 - name: Full name of the person
 - address: Complete address or location
@@ -90,8 +201,7 @@ Extract the following information from this resume text and return ONLY a JSON o
 - last_qualification: Most recent degree or qualification
 - last_institution: Most recent educational institution attended
 
-Resume text:
-{text[:3000]}  
+{resumes}
 
 Return ONLY valid JSON with the above keys. Use null for missing information.
 """
\ No newline at end of file
@@ -1,10 +1,11 @@
 import io
-import tempfile
+from contextlib import closing
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional, Tuple
 import logging
 
 import pdfplumber
+import pypdfium2 as pdfium
 from docx import Document
 
 from ..schemas import ExtractedData
@@ -16,6 +17,11 @@ logger = logging.getLogger(__name__)
 class ResumeParser:
     """Service for parsing resume files and extracting structured data"""
     
+    # PDF text extraction stops once either limit is reached; downstream
+    # extraction only needs the first few pages of a resume
+    PDF_MAX_PAGES = 20
+    PDF_MAX_CHARS = 8000
+    
     def __init__(self):
         self.text_extractor = TextExtractor()
         self.llm_extractor = LLMExtractor()
@@ -31,86 +37,153 @@ class ResumeParser:
         Returns:
             ExtractedData object with extracted information
         """
-        try:
-            # Extract text based on file extension
-            file_ext = Path(filename).suffix.lower()
-            
-            if file_ext == '.pdf':
-                text = self._extract_text_from_pdf(file_content)
-            elif file_ext == '.docx':
-                text = self._extract_text_from_docx(file_content)
-            else:
-                logger.error(f"Unsupported file type: {file_ext}")
-                return ExtractedData()  # Return empty data
-            
-            if not text or not text.strip():
-                logger.warning(f"No text extracted from {filename}")
-                return ExtractedData()
-            
-            logger.info(f"Extracted {len(text)} characters from {filename}")
-            
-            # Try LLM extraction first (if enabled)
-            extracted_data = self.llm_extractor.extract_data(text)
+        return self.parse_resumes([(filename, file_content)])[0]
+    
+    def parse_resumes(self, files: List[Tuple[str, bytes]]) -> List[ExtractedData]:
+        """
+        Parse a batch of resume files and extract structured data
+        
+        Resume texts are sent to the LLM in batched requests, and any the LLM
+        does not handle are passed to the spaCy extractor together so they
+        share a single nlp.pipe call.
+        
+        Args:
+            files: List of (filename, file_content) tuples
             
-            # Fallback to spaCy/regex extraction if LLM fails
+        Returns:
+            List of ExtractedData objects in the same order as files
+        """
+        results: List[ExtractedData] = [ExtractedData() for _ in files]
+        text_indices: List[int] = []
+        texts: List[str] = []
+        
+        for idx, (filename, file_content) in enumerate(files):
+            try:
+                text = self._extract_text(filename, file_content)
+                if text:
+                    text_indices.append(idx)
+                    texts.append(text)
+            except Exception as e:
+                logger.error(f"Error parsing resume {filename}: {str(e)}")
+        
+        # Try LLM extraction first (if enabled), batching resumes per request
+        llm_results = self.llm_extractor.extract_data_batch(texts)
+        
+        fallback_indices: List[int] = []
+        fallback_texts: List[str] = []
+        
+        for idx, text, extracted_data in zip(text_indices, texts, llm_results):
+            filename = files[idx][0]
             if extracted_data is None:
                 logger.info(f"Using spaCy extraction for {filename}")
-                extracted_data = self.text_extractor.extract_data(text)
+                fallback_indices.append(idx)
+                fallback_texts.append(text)
             else:
                 logger.info(f"Used LLM extraction for {filename}")
-            
-            return extracted_data
-            
-        except Exception as e:
-            logger.error(f"Error parsing resume {filename}: {str(e)}")
-            return ExtractedData()  # Return empty data on error
+                results[idx] = extracted_data
+        
+        # Fallback to spaCy/regex extraction for everything the LLM did not handle
+        if fallback_texts:
+            try:
+                for idx, extracted_data in zip(fallback_indices, self.text_extractor.extract_many(fallback_texts)):
+                    results[idx] = extracted_data
+            except Exception as e:
+                logger.error(f"Error running batched spaCy extraction, retrying one by one: {str(e)}")
+                # Retry each resume on its own so one bad text only blanks itself
+                for idx, text in zip(fallback_indices, fallback_texts):
+                    try:
+                        results[idx] = self.text_extractor.extract_data(text)
+                    except Exception as e:
+                        logger.error(f"Error running spaCy extraction for {files[idx][0]}: {str(e)}")
+        
+        return results
+    
+    def _extract_text(self, filename: str, file_content: bytes) -> str:
+        """Extract text from a resume file based on its extension"""
+        file_ext = Path(filename).suffix.lower()
+        
+        if file_ext == '.pdf':
+            text = self._extract_text_from_pdf(file_content)
+        elif file_ext == '.docx':
+            text = self._extract_text_from_docx(file_content)
+        else:
+            logger.error(f"Unsupported file type: {file_ext}")
+            return ""
+        
+        if not text or not text.strip():
+            logger.warning(f"No text extracted from {filename}")
+            return ""
+        
+        logger.info(f"Extracted {len(text)} characters from {filename}")
+        return text
     
     def _extract_text_from_pdf(self, file_content: bytes) -> str:
         """Extract text from PDF file content"""
         try:
-            text_parts = []
-            
-            with io.BytesIO(file_content) as pdf_stream:
-                with pdfplumber.open(pdf_stream) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-            
-            return '\n'.join(text_parts)
-            
+            with closing(self._iter_pdfium_pages(file_content)) as pages:
+                return self._join_page_texts(pages)
+        except Exception as e:
+            logger.warning(f"pypdfium2 could not read PDF, falling back to pdfplumber: {str(e)}")
+        
+        try:
+            with closing(self._iter_pdfplumber_pages(file_content)) as pages:
+                return self._join_page_texts(pages)
         except Exception as e:
             logger.error(f"Error extracting text from PDF: {str(e)}")
             return ""
     
+    def _join_page_texts(self, pages: Iterator[str]) -> str:
+        """Join page texts, stopping at the page and character limits"""
+        text_parts = []
+        total_chars = 0
+        
+        for page_num, page_text in enumerate(pages, 1):
+            if page_text:
+                text_parts.append(page_text)
+                total_chars += len(page_text)
+            
+            if page_num >= self.PDF_MAX_PAGES or total_chars >= self.PDF_MAX_CHARS:
+                logger.info(f"Stopped PDF text extraction after {page_num} pages ({total_chars} characters)")
+                break
+        
+        return '\n'.join(text_parts)
+    
+    def _iter_pdfium_pages(self, file_content: bytes) -> Iterator[str]:
+        """Yield the text of each PDF page using PDFium"""
+        pdf = pdfium.PdfDocument(file_content)
+        try:
+            for page in pdf:
+                textpage = page.get_textpage()
+                page_text = textpage.get_text_range()
+                textpage.close()
+                page.close()
+                yield page_text.replace('\r\n', '\n')
+        finally:
+            pdf.close()
+    
+    def _iter_pdfplumber_pages(self, file_content: bytes) -> Iterator[str]:
+        """Yield the text of each PDF page using pdfplumber"""
+        with io.BytesIO(file_content) as pdf_stream:
+            with pdfplumber.open(pdf_stream) as pdf:
+                for page in pdf.pages:
+                    yield page.extract_text() or ''
+    
     def _extract_text_from_docx(self, file_content: bytes) -> str:
         """Extract text from DOCX file content"""
         try:
-            text_parts = []
-            
-            # Create temporary file for docx processing
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as temp_file:
-                temp_file.write(file_content)
-                temp_file_path = temp_file.name
-            
-            try:
-                doc = Document(temp_file_path)
-                
-                # Extract text from paragraphs
-                for paragraph in doc.paragraphs:
-                    if paragraph.text.strip():
-                        text_parts.append(paragraph.text.strip())
-                
-                # Extract text from tables
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            if cell.text.strip():
-                                text_parts.append(cell.text.strip())
-            
-            finally:
-                # Clean up temporary file
-                Path(temp_file_path).unlink(missing_ok=True)
+            doc = Document(io.BytesIO(file_content))
+            
+            # Extract text from paragraphs
+            text_parts = [p.text.strip() for p in doc.paragraphs if p.text.strip()]
+            
+            # Extract text from tables
+            text_parts.extend(
+                cell.text.strip()
+                for table in doc.tables
+                for row in table.rows
+                for cell in row.cells
+                if cell.text.strip()
+            )
             
             return '\n'.join(text_parts)
             
@@ -1,4 +1,5 @@
 import re
+import ahocorasick
 import spacy
 from typing import Optional, List, Set
 import logging
@@ -7,47 +8,159 @@ from ..schemas import ExtractedData
 
 logger = logging.getLogger(__name__)
 
+# Degree keywords for qualification detection; keywords match whole words,
+# so common compound abbreviations (BSCS, BEng, MBBS) are listed explicitly
+DEGREE_KEYWORDS = frozenset({
+    'bs', 'bsc', 'ba', 'be', 'btech', 'btec', 'bachelor', 'bachelors',
+    'ms', 'msc', 'ma', 'me', 'mtech', 'master', 'masters',
+    'bscs', 'bsse', 'bsit', 'bsee', 'bsme', 'bsce', 'bcs', 'beng', 'bcom', 'barch',
+    'mscs', 'msse', 'msit', 'msee', 'mcs', 'meng', 'mcom',
+    'mbbs', 'bds', 'pharmd', 'llb', 'dae',
+    'mba', 'bba', 'mphil', 'phd', 'doctorate',
+    'intermediate', 'fsc', 'fa', 'hssc', 'hsc',
+    'diploma', 'diplomas', 'certificate', 'certificates', 'degree', 'degrees'
+})
+
+# Institution keywords
+INSTITUTION_KEYWORDS = frozenset({
+    'university', 'college', 'institute', 'school', 'academy',
+    'campus', 'polytechnic', 'technical', 'engineering'
+})
+
+# Address keywords used when no location entity is found
+_ADDRESS_KEYWORDS = frozenset({'street', 'st', 'avenue', 'ave', 'road', 'rd', 'city', 'state'})
+
+# Precompiled patterns used on every resume
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+# NANP numbers with an optional country code; the digit lookarounds reject
+# matches embedded in longer numbers such as ISBNs or IDs
+_PHONE_RE = re.compile(r'(?<!\d)(\+?\d{1,3}[-.\s]?)?\(?([2-9]\d{2})\)?[-.\s]?([2-9]\d{2})[-.\s]?(\d{4})(?!\d)')
+# Other international/local numbers must start with '+' or a trunk '0'
+_INTL_PHONE_RE = re.compile(r'(?<![\d+])(?:\+\d{1,3}[-.\s]?|0)\(?\d{2,4}\)?[-.\s]?\d{3,4}[-.\s]?\d{3,4}(?!\d)')
+# Placeholder area codes that never belong to a real number
+_PLACEHOLDER_AREA_CODES = frozenset({'555', '123', '000'})
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Keyword categories scanned by the combined automaton; degree and address
+# keywords include short abbreviations ('ms', 'st', 'rd'), so they must match
+# whole words
+_KEYWORD_CATEGORIES = (
+    ('degree', DEGREE_KEYWORDS),
+    ('institution', INSTITUTION_KEYWORDS),
+    ('address', _ADDRESS_KEYWORDS),
+)
+_WORD_BOUNDED_CATEGORIES = frozenset({'degree', 'address'})
+
+def _build_keyword_automaton() -> ahocorasick.Automaton:
+    """Compile every field keyword into one Aho-Corasick automaton tagged by category"""
+    categories_by_keyword = {}
+    for category, keywords in _KEYWORD_CATEGORIES:
+        for keyword in keywords:
+            categories_by_keyword.setdefault(keyword, []).append(category)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, categories in categories_by_keyword.items():
+        automaton.add_word(keyword, (keyword, tuple(categories)))
+    automaton.make_automaton()
+    return automaton
+
+_KEYWORD_AC = _build_keyword_automaton()
+
+def _is_word_match(text: str, end: int, keyword: str) -> bool:
+    """Check that a keyword match ending at `end` is not part of a longer word"""
+    start = end - len(keyword) + 1
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end + 1] if end + 1 < len(text) else ' '
+    return not before.isalnum() and not after.isalnum()
+
+def _keyword_categories(lower_line: str) -> Set[str]:
+    """Return the keyword categories found in a lowercased line"""
+    found: Set[str] = set()
+    for end, (keyword, categories) in _KEYWORD_AC.iter(lower_line):
+        for category in categories:
+            if category not in _WORD_BOUNDED_CATEGORIES or _is_word_match(lower_line, end, keyword):
+                found.add(category)
+    return found
+
+def _is_relevant_line(line: str) -> bool:
+    """Check whether a line mentions a degree, institution, email or phone number"""
+    if _keyword_categories(line.lower()) & {'degree', 'institution'}:
+        return True
+    
+    return bool(_EMAIL_RE.search(line) or _PHONE_RE.search(line) or _INTL_PHONE_RE.search(line))
+
+def condense_resume_text(text: str, header_chars: int = 400, max_lines: int = 40, max_chars: int = 1500) -> str:
+    """
+    Condense resume text to the header plus only the lines relevant to the
+    extracted fields, so long resumes fit a small prompt without losing the
+    education section
+    """
+    if len(text) <= max_chars:
+        return text
+    
+    header = text[:header_chars]
+    relevant = [line.strip() for line in text[header_chars:].split('\n') if _is_relevant_line(line)]
+    
+    condensed = header + '\n---\n' + '\n'.join(relevant[:max_lines])
+    return condensed[:max_chars]
+
 class TextExtractor:
     """Service for extracting structured data from resume text using spaCy and regex"""
     
+    # Pipeline components not needed for entity extraction (the ner
+    # component in en_core_web_sm has its own internal tok2vec layer)
+    EXCLUDED_PIPES = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+    
     def __init__(self):
         try:
-            self.nlp = spacy.load("en_core_web_sm")
-            logger.info("spaCy model loaded successfully")
+            # Use a GPU when one is available
+            if spacy.prefer_gpu():
+                logger.info("spaCy is using the GPU")
+            
+            # Only PERSON/GPE/LOC/ORG entities are used, so the remaining
+            # components are never loaded into memory
+            self.nlp = spacy.load("en_core_web_sm", exclude=self.EXCLUDED_PIPES)
+            logger.info(f"spaCy model loaded successfully with pipes: {self.nlp.pipe_names}")
         except OSError:
             logger.error("spaCy model 'en_core_web_sm' not found. Please install it with: python -m spacy download en_core_web_sm")
             raise
     
-    # Degree keywords for qualification detection
-    DEGREE_KEYWORDS = {
-        'bs', 'bsc', 'ba', 'be', 'btech', 'btec', 'bachelor',
-        'ms', 'msc', 'ma', 'me', 'mtech', 'master', 'masters',
-        'mba', 'bba', 'mphil', 'phd', 'doctorate',
-        'intermediate', 'fsc', 'fa', 'hssc', 'hsc',
-        'diploma', 'certificate', 'degree'
-    }
-    
-    # Institution keywords
-    INSTITUTION_KEYWORDS = {
-        'university', 'college', 'institute', 'school', 'academy',
-        'campus', 'polytechnic', 'technical', 'engineering'
-    }
+    # Number of documents spaCy processes per internal batch
+    PIPE_BATCH_SIZE = 32
+    
+    def warm_up(self) -> None:
+        """Run the pipeline once so lazy initialization happens before real work"""
+        self.nlp("Warm up the pipeline with a short sentence.")
+        logger.info("spaCy pipeline warmed up")
     
     def extract_data(self, text: str) -> ExtractedData:
         """Extract structured data from resume text"""
+        return self.extract_many([text])[0]
+    
+    def extract_many(self, texts: List[str]) -> List[ExtractedData]:
+        """Extract structured data from several resume texts in one spaCy pass"""
         # Normalize text
-        text = self._normalize_text(text)
+        texts = [self._normalize_text(text) for text in texts]
+        
+        # Process with spaCy in batches
+        docs = self.nlp.pipe(texts, batch_size=self.PIPE_BATCH_SIZE)
         
-        # Process with spaCy
-        doc = self.nlp(text)
+        return [self._extract_fields(doc, text) for doc, text in zip(docs, texts)]
+    
+    def _extract_fields(self, doc, text: str) -> ExtractedData:
+        """Extract each field from a processed spaCy doc and its text"""
+        # Split and lowercase once, then tag every line with its keyword
+        # categories in a single automaton pass
+        lines = text.split('\n')
+        lower_lines = [line.lower() for line in lines]
+        line_categories = [_keyword_categories(line) for line in lower_lines]
         
-        # Extract each field
-        name = self._extract_name(doc, text)
+        name = self._extract_name(doc, lines)
         email = self._extract_email(text)
         contact_number = self._extract_contact_number(text)
-        address = self._extract_address(doc, text)
-        last_qualification = self._extract_last_qualification(text)
-        last_institution = self._extract_last_institution(doc, text)
+        address = self._extract_address(doc, lines, lower_lines, line_categories)
+        last_qualification = self._extract_last_qualification(lines, line_categories)
+        last_institution = self._extract_last_institution(doc, lines, line_categories)
         
         return ExtractedData(
             name=name,
@@ -59,13 +172,13 @@ class TextExtractor:
         )
     
     def _normalize_text(self, text: str) -> str:
-        """Normalize text for processing"""
-        # Remove extra whitespace and normalize line endings
-        text = re.sub(r'\s+', ' ', text.strip())
-        text = re.sub(r'\n+', '\n', text)
-        return text
+        """Normalize text for processing, keeping the line structure"""
+        # Normalize line endings, strip trailing whitespace per line and
+        # collapse runs of blank lines
+        lines = [line.rstrip() for line in text.strip().splitlines()]
+        return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines))
     
-    def _extract_name(self, doc, text: str) -> Optional[str]:
+    def _extract_name(self, doc, lines: List[str]) -> Optional[str]:
         """Extract person name using spaCy NER"""
         # Look for PERSON entities
         persons = [ent.text.strip() for ent in doc.ents if ent.label_ == "PERSON"]
@@ -75,8 +188,7 @@ class TextExtractor:
             return persons[0]
         
         # Fallback: look for name patterns in first few lines
-        lines = text.split('\n')[:5]  # Check first 5 lines
-        for line in lines:
+        for line in lines[:5]:  # Check first 5 lines
             line = line.strip()
             # Simple heuristic: line with 2-4 words, mostly alphabetic
             words = line.split()
@@ -87,90 +199,67 @@ class TextExtractor:
     
     def _extract_email(self, text: str) -> Optional[str]:
         """Extract email address using regex"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        matches = re.findall(email_pattern, text)
-        return matches[0] if matches else None
+        match = _EMAIL_RE.search(text)
+        return match.group(0) if match else None
     
     def _extract_contact_number(self, text: str) -> Optional[str]:
         """Extract contact number using regex"""
-        # Pattern for various phone number formats
-        phone_patterns = [
-            r'\+?\d{1,4}[-.\s]?\(?\d{1,4}\)?[-.\s]?\d{1,4}[-.\s]?\d{1,9}',  # International
-            r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',  # US format
-            r'\d{10,15}',  # Simple digit sequence
-        ]
+        for match in _PHONE_RE.finditer(text):
+            if match.group(2) not in _PLACEHOLDER_AREA_CODES:
+                return match.group(0).strip()
         
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                # Return the first valid-looking phone number
-                for match in matches:
-                    # Clean up the match
-                    cleaned = re.sub(r'[^\d+]', '', match)
-                    if 7 <= len(cleaned) <= 15:  # Reasonable phone number length
-                        return match.strip()
-        
-        return None
+        match = _INTL_PHONE_RE.search(text)
+        return match.group(0).strip() if match else None
     
-    def _extract_address(self, doc, text: str) -> Optional[str]:
+    def _extract_address(self, doc, lines: List[str], lower_lines: List[str],
+                         line_categories: List[Set[str]]) -> Optional[str]:
         """Extract address using spaCy entities and heuristics"""
         # Look for GPE (Geopolitical entities) and LOC (Locations)
-        locations = [ent.text for ent in doc.ents if ent.label_ in ["GPE", "LOC"]]
+        locations = [ent.text.lower() for ent in doc.ents if ent.label_ in ["GPE", "LOC"]]
         
         if locations:
             # Try to find a line containing location information
-            lines = text.split('\n')
-            for line in lines:
-                for location in locations:
-                    if location.lower() in line.lower():
-                        # Return the line containing location info
-                        return line.strip()
-        
-        # Fallback: look for address keywords
-        address_keywords = ['street', 'st', 'avenue', 'ave', 'road', 'rd', 'city', 'state']
-        lines = text.split('\n')
-        for line in lines:
-            line_lower = line.lower()
-            if any(keyword in line_lower for keyword in address_keywords):
-                return line.strip()
+            for line, line_lower in zip(lines, lower_lines):
+                if any(location in line_lower for location in locations):
+                    # Return the line containing location info
+                    return line.strip()
         
-        return None
+        # Fallback: first line with address keywords
+        return self._first_line_with(lines, line_categories, 'address')
     
-    def _extract_last_qualification(self, text: str) -> Optional[str]:
+    def _extract_last_qualification(self, lines: List[str], line_categories: List[Set[str]]) -> Optional[str]:
         """Extract last qualification using keyword matching"""
-        lines = text.split('\n')
-        
-        # Look for degree keywords in reverse order (bottom-up)
-        for line in reversed(lines):
-            line_lower = line.lower()
-            for degree in self.DEGREE_KEYWORDS:
-                if degree in line_lower:
-                    return line.strip()
-        
-        return None
+        # Look for degree keywords bottom-up
+        return self._last_line_with(lines, line_categories, 'degree')
     
-    def _extract_last_institution(self, doc, text: str) -> Optional[str]:
+    def _extract_last_institution(self, doc, lines: List[str], line_categories: List[Set[str]]) -> Optional[str]:
         """Extract last institution using spaCy ORG entities and keywords"""
+        # Bottom-most line containing an institution keyword
+        line = self._last_line_with(lines, line_categories, 'institution')
+        if line is not None:
+            return line
+        
         # Get organization entities
         organizations = [ent.text for ent in doc.ents if ent.label_ == "ORG"]
         
-        lines = text.split('\n')
-        
-        # First, try to find organizations that contain institution keywords
-        for line in reversed(lines):  # Bottom-up search
-            line_lower = line.lower()
-            
-            # Check if line contains institution keywords
-            if any(keyword in line_lower for keyword in self.INSTITUTION_KEYWORDS):
-                # Check if any organization is in this line
-                for org in organizations:
-                    if org.lower() in line_lower:
-                        return line.strip()
-                # If no org found but has institution keywords, return the line
-                return line.strip()
-        
         # Fallback: return the last organization found
         if organizations:
             return organizations[-1]
         
+        return None
+    
+    @staticmethod
+    def _first_line_with(lines: List[str], line_categories: List[Set[str]], category: str) -> Optional[str]:
+        """Return the first stripped line tagged with the given keyword category"""
+        for line, categories in zip(lines, line_categories):
+            if category in categories:
+                return line.strip()
+        return None
+    
+    @staticmethod
+    def _last_line_with(lines: List[str], line_categories: List[Set[str]], category: str) -> Optional[str]:
+        """Return the last stripped line tagged with the given keyword category"""
+        for line, categories in zip(reversed(lines), reversed(line_categories)):
+            if category in categories:
+                return line.strip()
         return None
\ No newline at end of file
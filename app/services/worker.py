@@ -0,0 +1,55 @@
+import logging
+from typing import List, Optional, Tuple
+
+from ..schemas import ExtractedData
+from .resume_parser import ResumeParser
+
+logger = logging.getLogger(__name__)
+
+# Per-process parser, created on first use so spaCy and the OpenAI client
+# are loaded once per worker rather than once per resume
+_resume_parser: Optional[ResumeParser] = None
+
+def _get_parser() -> ResumeParser:
+    """Return the parser for the current worker process"""
+    global _resume_parser
+    if _resume_parser is None:
+        _resume_parser = ResumeParser()
+    return _resume_parser
+
+def _init_worker() -> None:
+    """
+    Load the parser and warm it up when a worker process starts, so the
+    first request does not pay for model loading and lazy initialization
+    """
+    # Parser construction errors (e.g. a missing spaCy model) propagate so the
+    # pool breaks and app startup fails instead of serving blank results
+    parser = _get_parser()
+    
+    try:
+        parser.text_extractor.warm_up()
+        parser.llm_extractor.preflight()
+    except Exception as e:
+        logger.error(f"Worker warm-up failed: {str(e)}")
+
+def _ready() -> bool:
+    """No-op task used to start every worker process at app startup"""
+    return True
+
+def _parse_batch(batch: List[Tuple[str, bytes]]) -> List[ExtractedData]:
+    """
+    Parse a batch of resumes inside a worker process
+    
+    Args:
+        batch: List of (filename, file_content) tuples
+        
+    Returns:
+        List of ExtractedData objects in input order, empty where parsing failed
+    """
+    parser = _get_parser()
+    
+    try:
+        return parser.parse_resumes(batch)
+    except Exception as e:
+        logger.error(f"Error processing batch of {len(batch)} resumes: {str(e)}")
+        return [ExtractedData() for _ in batch]
\ No newline at end of file